@@ -1,9 +1,13 @@
 # camera.py
 
 # Import necessary modules
+import math
 import numpy as np
 import pygame
 
+# Floating point precision used for all ray math
+DTYPE = np.float32
+
 class Camera:
 
     # Initialize the camera with default parameters
@@ -25,11 +29,18 @@ class Camera:
         self.phi = 0
 
         # Camera control parameters
-        self.fov = np.radians(50)
+        self.fov = math.radians(50)
         self.mouse_sensitivity = 0.005
         self.dragging = False
         self._dirty = True
 
+        # Cached position and basis vectors, rebuilt only after the camera moves
+        self._pos = None
+        self._basis = None
+
+        # Font is created on first draw, pygame.font may not be initialized yet
+        self._font = None
+
 
     # Handle mouse events for camera control
     def handle_event(self, event):
@@ -59,8 +70,10 @@ class Camera:
             dx, dy = event.rel
             self.theta += dx * self.mouse_sensitivity
             self.phi -= dy * self.mouse_sensitivity
-            self.phi = max(-np.pi/2, min(np.pi/2, self.phi))
+            self.phi = max(-math.pi/2, min(math.pi/2, self.phi))
             self._dirty = True
+            self._pos = None
+            self._basis = None
 
 
     # Update the camera position based on time delta
@@ -80,14 +93,19 @@ class Camera:
         Outputs: numpy array of camera position [x, y, z]
 
         """
+
+        # Reuse the cached position while the camera is stationary
+        if self._pos is not None:
+            return self._pos
         
         # Convert spherical coordinates to Cartesian coordinates
-        x = self.radius * np.cos(self.phi) * np.cos(self.theta)
-        y = self.radius * np.sin(self.phi)
-        z = self.radius * np.cos(self.phi) * np.sin(self.theta)
+        x = self.radius * math.cos(self.phi) * math.cos(self.theta)
+        y = self.radius * math.sin(self.phi)
+        z = self.radius * math.cos(self.phi) * math.sin(self.theta)
 
-        # Return position as numpy array
-        return np.array([x, y, z])
+        # Cache and return position as numpy array
+        self._pos = np.asarray([x, y, z], dtype=DTYPE)
+        return self._pos
 
 
     # Draw camera information on the screen
@@ -109,8 +127,9 @@ class Camera:
         text = f"Camera pos: {pos.round(2)}"
 
         # Get font and render text
-        font = pygame.font.SysFont(None, 24)
-        img = font.render(text, True, (255, 255, 255))
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, 24)
+        img = self._font.render(text, True, (255, 255, 255))
         screen.blit(img, (10, 10))
 
 
@@ -126,6 +145,10 @@ class Camera:
 
         """
 
+        # Reuse the cached basis while the camera is stationary
+        if self._basis is not None:
+            return self._basis
+
         # Get camera position
         pos = self.position()
 
@@ -133,15 +156,16 @@ class Camera:
         forward = -pos / np.linalg.norm(pos)
 
         # Compute right vector as cross product with world up
-        world_up = np.array([0, 1, 0])
+        world_up = np.array([0, 1, 0], dtype=DTYPE)
         right = np.cross(world_up, forward)
         right /= np.linalg.norm(right)
 
         # Compute up vector as cross product with forward and right
         up = np.cross(forward, right)
 
-        # Return basis vectors
-        return forward, right, up
+        # Cache and return basis vectors
+        self._basis = (forward, right, up)
+        return self._basis
 
     
     # Get ray direction through pixel
@@ -169,7 +193,7 @@ class Camera:
         aspect = img_w / img_h
 
         # Convert NDC to a direction in camera space using FOV
-        tan_half_fov = np.tan(self.fov / 2.0)
+        tan_half_fov = math.tan(self.fov / 2.0)
         x_cam = x_ndc * aspect * tan_half_fov
         y_cam = y_ndc * tan_half_fov
         z_cam = 1.0
@@ -180,6 +204,50 @@ class Camera:
         return dir_world
 
 
+    # Get ray directions through every pixel
+    def ray_directions(self, img_w, img_h):
+
+        """
+
+        Compute the ray directions from the camera through every pixel of the image
+
+        Inputs: img_w (int), img_h (int)
+
+        Outputs: dx, dy, dz as separate contiguous (img_h, img_w) numpy arrays
+
+        """
+
+        # Get camera basis vectors
+        forward, right, up = self.basis_vectors()
+
+        # Pixel coordinate grids, xs and ys have shape (img_h, img_w)
+        xs, ys = np.meshgrid(np.arange(img_w), np.arange(img_h))
+
+        # Convert pixel coords to Normalized Device Coordinates (NDC) in [-1, 1]
+        x_ndc = ( (xs + 0.5) / img_w ) * 2.0 - 1.0
+        y_ndc = 1.0 - ( (ys + 0.5) / img_h ) * 2.0
+
+        # Convert NDC to directions in camera space using FOV and aspect ratio
+        aspect = img_w / img_h
+        tan_half_fov = math.tan(self.fov / 2.0)
+        x_cam = x_ndc * aspect * tan_half_fov
+        y_cam = y_ndc * tan_half_fov
+
+        # Convert camera-space directions to world-space directions, one array per component
+        dx = (x_cam * right[0]) + (y_cam * up[0]) + forward[0]
+        dy = (x_cam * right[1]) + (y_cam * up[1]) + forward[1]
+        dz = (x_cam * right[2]) + (y_cam * up[2]) + forward[2]
+
+        # Normalize
+        norm = np.sqrt(dx * dx + dy * dy + dz * dz)
+        dx /= norm
+        dy /= norm
+        dz /= norm
+        return (np.ascontiguousarray(dx, dtype=DTYPE),
+                np.ascontiguousarray(dy, dtype=DTYPE),
+                np.ascontiguousarray(dz, dtype=DTYPE))
+
+
     # Check and consume dirty flag
     def consume_dirty(self):
 
@@ -0,0 +1,71 @@
+# gpu_render.py
+
+# Import necessary modules
+import os
+import moderngl
+
+# Directory containing the shader sources
+SHADER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# GPU renderer class
+class GPURender:
+
+    # Compile the raytracing shaders for the given OpenGL context
+    def __init__(self, ctx, width, height, bh_radius, r_inner, r_outer):
+
+        """
+
+        Build the fullscreen raytracing program
+
+        Inputs: ctx (moderngl context), width (int), height (int), black hole radius,
+                inner and outer radius of disk
+
+        Outputs: none
+
+        """
+
+        self.ctx = ctx
+
+        # Load and compile the shaders
+        with open(os.path.join(SHADER_DIR, "raytrace.vert")) as f:
+            vertex_shader = f.read()
+        with open(os.path.join(SHADER_DIR, "raytrace.frag")) as f:
+            fragment_shader = f.read()
+        self.program = ctx.program(vertex_shader=vertex_shader, fragment_shader=fragment_shader)
+
+        # Fullscreen triangle, vertices are generated in the vertex shader
+        self.vao = ctx.vertex_array(self.program, [])
+
+        # Scene parameters never change, so set them once
+        self.program["uResolution"].value = (width, height)
+        self.program["uBHRadius"].value = bh_radius
+        self.program["uRInner"].value = r_inner
+        self.program["uROuter"].value = r_outer
+
+
+    # Render a frame
+    def render(self, camera):
+
+        """
+
+        Update the camera uniforms and raytrace the whole frame on the GPU
+
+        Inputs: camera object
+
+        Outputs: none, the frame is drawn to the bound framebuffer
+
+        """
+
+        # Get camera position and basis vectors
+        forward, right, up = camera.basis_vectors()
+
+        # Upload camera uniforms, the float32 vectors are written directly
+        self.program["uCamPos"].write(camera.position().tobytes())
+        self.program["uForward"].write(forward.tobytes())
+        self.program["uRight"].write(right.tobytes())
+        self.program["uUp"].write(up.tobytes())
+        self.program["uFov"].value = camera.fov
+
+        # Draw the fullscreen triangle
+        self.vao.render(moderngl.TRIANGLES, vertices=3)
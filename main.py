@@ -5,12 +5,48 @@ import numpy as np
 import pygame
 from camera import Camera
 
+# Use the compiled C kernel if it has been built, then Numba, otherwise fall back to NumPy
+try:
+    from raytrace_c import render_tile
+except ImportError:
+    try:
+        from render_kernel import render_tile
+    except ImportError:
+        render_tile = None
+
+# Raytrace on the GPU with an OpenGL fragment shader when moderngl is installed
+try:
+    import moderngl
+    from gpu_render import GPURender
+except ImportError:
+    moderngl = None
+
 # Initialize Pygame
 pygame.init()
 
 # Set up display
 WIDTH, HEIGHT = 200, 150
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+# Fraction of the screen resolution that is raytraced on the CPU, the result is upscaled
+RENDER_SCALE = 0.5
+
+# The GPU path needs an OpenGL 3.3 core window, the shaders use #version 330 core
+USE_GPU = moderngl is not None
+if USE_GPU:
+    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
+    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
+    pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
+    try:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.OPENGL | pygame.DOUBLEBUF)
+        gl_ctx = moderngl.create_context()
+    except (pygame.error, moderngl.Error, RuntimeError) as error:
+        # No usable OpenGL, fall back to raytracing on the CPU
+        # RuntimeError covers create_context failing to find a GL window
+        print(f"OpenGL unavailable, raytracing on the CPU instead: {error}")
+        USE_GPU = False
+
+if not USE_GPU:
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Black Hole Simulation")
 
 # Set up clock for controlling frame rate
@@ -22,104 +58,178 @@ BH_RADIUS = 1.5
 DISK_INNER_RADIUS = 5.0
 DISK_OUTER_RADIUS = 8.0
 
+# Number of entries in the disk color lookup table
+DISK_LUT_SIZE = 1024
 
-#
-def intersect_sphere(ro, rd, radius):
+
+# Check for intersection between rays and sphere
+def intersect_sphere_batch(ro, rdx, rdy, rdz, radius):
     """ 
 
-    Check for intersection between ray and sphere
+    Check for intersection between a grid of rays and sphere
 
-    Inputs: ray origin (ro), ray direction (rd), sphere radius
+    Inputs: ray origin (ro), ray direction components (rdx, rdy, rdz, (H, W) arrays), sphere radius
 
-    Outputs: distance to intersection or None if no intersection
+    Outputs: (H, W) array of distances to intersection, np.inf where there is no intersection
 
 
     """
 
-    # Solve |ro + t*rd|^2 = radius^2
+    # Solve |ro + t*rd|^2 = radius^2 for every ray
     # Coefficients of quadratic equation
-    b = 2 * np.dot(ro, rd)
-    c = np.dot(ro, ro) - radius * radius
+    b = 2 * (ro[0] * rdx + ro[1] * rdy + ro[2] * rdz)
+    c = ro[0] * ro[0] + ro[1] * ro[1] + ro[2] * ro[2] - radius * radius
     # Discriminant
     disc = b * b - 4 * c
 
-    # No intersection if discriminant is negative
-    if disc < 0:
-        return None
+    # No intersection where discriminant is negative
+    hit = disc >= 0
 
     # Compute intersection distances
-    sqrt_disc = np.sqrt(disc)
-
-    # Return the nearest positive intersection
+    sqrt_disc = np.sqrt(np.where(hit, disc, 0))
     t0 = (-b - sqrt_disc) / 2
     t1 = (-b + sqrt_disc) / 2
 
-    # Check for valid intersections
-    if t0 > 1e-6:
-        return t0
-    if t1 > 1e-6:
-        return t1
+    # Take the nearest positive intersection
+    t = np.where(t0 > 1e-6, t0, np.where(t1 > 1e-6, t1, np.inf))
 
-    # No valid intersection
-    return None
+    return np.where(hit, t, np.inf)
 
 
-# Check for intersection between ray and disk
-def intersect_disk(ro, rd, r_inner, r_outer):
+# Check for intersection between rays and disk
+def intersect_disk_batch(ro, rdx, rdy, rdz, r_inner, r_outer):
 
     """ 
 
-    Check for intersection between ray and accretion disk
+    Check for intersection between a grid of rays and accretion disk
 
-    Inputs: ray origin (ro), ray direction (rd), inner and outer radius of disk
+    Inputs: ray origin (ro), ray direction components (rdx, rdy, rdz, (H, W) arrays), inner and outer radius of disk
 
-    Outputs: distance to intersection or None if no intersection
+    Outputs: (H, W) array of distances to intersection, np.inf where there is no intersection
 
 
     """
 
-    # Avoid division by zero
-    if abs(rd[1]) < 1e-6:
-        return None
-
-    # Compute t where ray intersects the plane y=0
-    t = -ro[1] / rd[1]
-    if t < 1e-6:
-        return None
+    # Compute t where each ray intersects the plane y=0
+    # Rays parallel to the plane divide by 1 instead and are masked out below
+    parallel = np.abs(rdy) < 1e-6
+    safe_rdy = np.where(parallel, 1, rdy)
+    t = -ro[1] / safe_rdy
 
     # Compute intersection with the plane y=0
-    p = ro + t * rd
-    r = np.sqrt(p[0]*p[0] + p[2]*p[2])
-    if r_inner <= r <= r_outer:
-        return t
+    px = ro[0] + t * rdx
+    pz = ro[2] + t * rdz
+    r2 = px * px + pz * pz
+
+    # Rays parallel to the plane, behind the camera or outside the disk miss
+    valid = (~parallel & (t >= 1e-6)
+             & (r2 >= r_inner * r_inner) & (r2 <= r_outer * r_outer))
+
+    return np.where(valid, t, np.inf)
+
+
+# Build the disk color lookup table
+def build_disk_lut(size):
+
+    """ 
+
+    Precompute the disk color gradient, shading only depends on the radius
+
+    Inputs: number of entries (size)
 
-    # No intersection
-    return None
+    Outputs: (size, 3) uint8 numpy array of colors for u evenly spaced in [0, 1]
+
+
+    """
+
+    u = np.linspace(0, 1, size)
+    brightness = (255 * (1 - 0.8 * u)).astype(np.uint8)
+
+    # Warm color gradient from yellow to red
+    return np.stack([brightness,
+                     (brightness * 0.8).astype(np.uint8),
+                     (brightness * 0.3).astype(np.uint8)], axis=1)
+
+
+DISK_LUT = build_disk_lut(DISK_LUT_SIZE)
 
 
 # Shading function for the disk
-def shade_disk(point):
+def shade_disk_batch(px, pz):
 
     """ 
 
-    Simple shading function for the disk
+    Simple shading function for the disk, colors are looked up by radius
 
-    Inputs: intersection point (3D numpy array)
+    Inputs: x and z coordinates of intersection points (px, pz, numpy arrays)
 
-    Outputs: color (RGB tuple)
+    Outputs: colors ((N, 3) uint8 numpy array)
 
 
     """
 
-    r = np.sqrt(point[0]*point[0] + point[2]*point[2])
+    r = np.sqrt(px * px + pz * pz)
 
-    # Map r in [DISK_INNER, DISK_OUTER] to color gradient
+    # Map r in [DISK_INNER, DISK_OUTER] to the nearest lookup table entry
     u = (r - DISK_INNER_RADIUS) / (DISK_OUTER_RADIUS - DISK_INNER_RADIUS)
-    u = np.clip(u, 0, 1)
-    brightness = int(255 * (1 - 0.8 * u))
+    u_idx = np.clip(u * (DISK_LUT_SIZE - 1) + 0.5, 0, DISK_LUT_SIZE - 1).astype(np.int32)
 
-    # Warm color gradient from yellow to red
-    return (brightness, int(brightness * 0.8), int(brightness * 0.3))
+    return DISK_LUT[u_idx]
+
+
+# Trace a grid of rays
+def trace(ro, rdx, rdy, rdz, out):
+
+    """ 
+
+    Trace a grid of rays through the scene in a single masked pass
+
+    Inputs: ray origin (ro), ray direction components (rdx, rdy, rdz, (H, W) arrays),
+            output image (out, (H, W, 3) uint8 array)
+
+    Outputs: none, pixel colors are written into out
+
+
+    """
+
+    # Rays that miss the sphere bounding the disk cannot hit anything
+    # b is built in place to avoid a temporary per term
+    b = np.multiply(rdx, 2 * ro[0])
+    b += (2 * ro[1]) * rdy
+    b += (2 * ro[2]) * rdz
+    c = ro[0] * ro[0] + ro[1] * ro[1] + ro[2] * ro[2] - DISK_OUTER_RADIUS * DISK_OUTER_RADIUS
+    # b is not needed after squaring, so b2 reuses its buffer
+    b2 = np.multiply(b, b, out=b)
+    mask = b2 >= 4 * c
+
+    # Check for intersections, only for rays inside the bounding sphere
+    rdx_hit = rdx[mask]
+    rdy_hit = rdy[mask]
+    rdz_hit = rdz[mask]
+    t_bh = intersect_sphere_batch(ro, rdx_hit, rdy_hit, rdz_hit, BH_RADIUS)
+    t_disk = intersect_disk_batch(ro, rdx_hit, rdy_hit, rdz_hit,
+                                  DISK_INNER_RADIUS, DISK_OUTER_RADIUS)
+
+    # Decide what each of those rays sees
+    hit_bh = t_bh < t_disk
+    hit_disk = ~hit_bh & np.isfinite(t_disk)
+
+    # Shade only the disk pixels, colors are gathered from the lookup table
+    t = t_disk[hit_disk]
+    disk = shade_disk_batch(ro[0] + t * rdx_hit[hit_disk], ro[2] + t * rdz_hit[hit_disk])
+
+    # Scatter the decisions back to full image masks
+    mask_bh = np.zeros(rdx.shape, dtype=bool)
+    mask_disk = np.zeros(rdx.shape, dtype=bool)
+    mask_bh[mask] = hit_bh
+    mask_disk[mask] = hit_disk
+
+    # Write each channel in place: background, then disk, then black hole
+    for channel_index, background in enumerate((25, 25, 45)):
+        channel = out[..., channel_index]
+        channel[...] = background
+        channel[mask_disk] = disk[:, channel_index]
+        np.putmask(channel, mask_bh, 0)
 
 
 # Rendering function
@@ -136,78 +246,48 @@ def render(camera):
 
     """
 
-    img = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    img = np.empty((HEIGHT, WIDTH, 3), dtype=np.uint8)
     ro = camera.position()
-
-    for y in range(HEIGHT):
-        for x in range(WIDTH):
-
-            # Get ray direction
-            rd = camera.ray_direction(x, y, WIDTH, HEIGHT)
-            
-            # Check for intersections
-            t_bh = intersect_sphere(ro, rd, BH_RADIUS)
-            t_disk = intersect_disk(ro, rd, DISK_INNER_RADIUS, DISK_OUTER_RADIUS)
-
-            # Decide what pixel sees
-            if t_bh is not None and (t_disk is None or t_bh < t_disk):
-                # Hit black hole - render black
-                img[y, x] = (0, 0, 0)
-
-            elif t_disk is not None:
-                # Hit disk - shade accordingly
-                hit = ro + t_disk * rd
-                img[y, x] = shade_disk(hit)
-
-            else:
-                # Background color - dark blue
-                img[y, x] = (25, 25, 45)
+    rdx, rdy, rdz = camera.ray_directions(WIDTH, HEIGHT)
+    trace(ro, rdx, rdy, rdz, img)
 
     return img
 
 
 # Progressive renderer class
 class ProgressiveRender:
-    def __init__(self, HEIGHT, WIDTH):
-        self.rw = WIDTH
-        self.rh = HEIGHT
+    def __init__(self, HEIGHT, WIDTH, render_scale=1.0):
+        self.render_scale = render_scale
+        self.rw = int(WIDTH * render_scale)
+        self.rh = int(HEIGHT * render_scale)
         self.frame = np.zeros((self.rh, self.rw, 3), dtype=np.uint8)
         self.next_row = 0
         self.active = True
+        self._rdx = None
+        self._rdy = None
+        self._rdz = None
 
-    def start(self):
+    def start(self, camera):
         self.next_row = 0
         self.active = True
 
+        # Ray directions only change when the camera moves, so build them once here
+        self._rdx, self._rdy, self._rdz = camera.ray_directions(self.rw, self.rh)
+
     def step(self, camera, rows_per_frame):
         if not self.active:
             return
 
         ro = camera.position()
 
-        for y in range(self.next_row, min(self.next_row + rows_per_frame, self.rh)):
-            for x in range(self.rw):
-
-                # Get ray direction
-                rd = camera.ray_direction(x, y, self.rw, self.rh)
-
-                # Check for intersections
-                t_bh = intersect_sphere(ro, rd, BH_RADIUS)
-                t_disk = intersect_disk(ro, rd, DISK_INNER_RADIUS, DISK_OUTER_RADIUS)
-
-                # Decide what pixel sees
-                if t_bh is not None and (t_disk is None or t_bh < t_disk):
-                    # Hit black hole - render black
-                    self.frame[y, x] = (0, 0, 0)
-
-                elif t_disk is not None:
-                    # Hit disk - shade accordingly
-                    hit = ro + t_disk * rd
-                    self.frame[y, x] = shade_disk(hit)
-
-                else:
-                    # Background color - dark blue
-                    self.frame[y, x] = (25, 25, 45)
+        # Trace the next block of rows in one batch
+        y0 = self.next_row
+        y1 = min(self.next_row + rows_per_frame, self.rh)
+        if render_tile is not None:
+            render_tile(ro, self._rdx[y0:y1], self._rdy[y0:y1], self._rdz[y0:y1],
+                        BH_RADIUS, DISK_INNER_RADIUS, DISK_OUTER_RADIUS, self.frame[y0:y1])
+        else:
+            trace(ro, self._rdx[y0:y1], self._rdy[y0:y1], self._rdz[y0:y1], self.frame[y0:y1])
 
         self.next_row += rows_per_frame
 
@@ -215,8 +295,18 @@ class ProgressiveRender:
             self.active = False
 
 
-renderer = ProgressiveRender(HEIGHT, WIDTH)
-renderer.start()
+# Set up the renderer
+if USE_GPU:
+    # The whole frame is raytraced by the fragment shader every frame
+    gpu_renderer = GPURender(gl_ctx, WIDTH, HEIGHT,
+                             BH_RADIUS, DISK_INNER_RADIUS, DISK_OUTER_RADIUS)
+
+else:
+    renderer = ProgressiveRender(HEIGHT, WIDTH, RENDER_SCALE)
+    renderer.start(camera)
+
+    # Persistent low resolution surface the frame is copied into each frame
+    surf = pygame.Surface((renderer.rw, renderer.rh))
 
             
 # Main loop
@@ -232,19 +322,26 @@ while running:
             running = False
         camera.handle_event(event)
 
-    # Update camera when camera is moved 
-    if camera.consume_dirty():
-        renderer.start()
+    if USE_GPU:
+        # Only the camera uniforms change between frames
+        gpu_renderer.render(camera)
+
+    else:
+        # Update camera when camera is moved 
+        if camera.consume_dirty():
+            renderer.start(camera)
+
+        # The screen keeps the last frame, so only redraw while rows are still being traced
+        if renderer.active:
+            renderer.step(camera, 20)
+            frame = renderer.frame 
 
-    renderer.step(camera, 20)
-    frame = renderer.frame 
+            # Copy the frame into the persistent surface, swapaxes is a view indexed (x, y)
+            pygame.surfarray.blit_array(surf, frame.swapaxes(0, 1))
 
-    # Convert numpy array to Pygame surface and scale to screen size
-    surf = pygame.surfarray.make_surface(np.transpose(frame, (1, 0, 2)))
-    surf = pygame.transform.scale(surf, (WIDTH, HEIGHT))
+            # Upscale straight onto the screen, no intermediate surface
+            pygame.transform.scale(surf, (WIDTH, HEIGHT), screen)
 
-    # Blit to screen
-    screen.blit(surf, (0, 0))
     pygame.display.flip()
 
 
@@ -0,0 +1,104 @@
+#version 330 core
+
+// raytrace.frag
+
+// Camera parameters
+uniform vec3 uCamPos;
+uniform vec3 uRight;
+uniform vec3 uUp;
+uniform vec3 uForward;
+uniform float uFov;
+uniform vec2 uResolution;
+
+// Scene parameters
+uniform float uBHRadius;
+uniform float uRInner;
+uniform float uROuter;
+
+out vec4 fragColor;
+
+
+// Check for intersection between ray and sphere, returns -1.0 if no intersection
+float intersect_sphere(vec3 ro, vec3 rd, float radius) {
+
+    // Solve |ro + t*rd|^2 = radius^2
+    float b = 2.0 * dot(ro, rd);
+    float c = dot(ro, ro) - radius * radius;
+    float disc = b * b - 4.0 * c;
+
+    // No intersection if discriminant is negative
+    if (disc < 0.0) {
+        return -1.0;
+    }
+
+    // Return the nearest positive intersection
+    float sqrt_disc = sqrt(disc);
+    float t0 = (-b - sqrt_disc) / 2.0;
+    float t1 = (-b + sqrt_disc) / 2.0;
+    if (t0 > 1e-6) {
+        return t0;
+    }
+    if (t1 > 1e-6) {
+        return t1;
+    }
+    return -1.0;
+}
+
+
+// Check for intersection between ray and disk, returns -1.0 if no intersection
+float intersect_disk(vec3 ro, vec3 rd, float r_inner, float r_outer) {
+
+    // Avoid division by zero
+    if (abs(rd.y) < 1e-6) {
+        return -1.0;
+    }
+
+    // Compute t where ray intersects the plane y=0
+    float t = -ro.y / rd.y;
+    if (t < 1e-6) {
+        return -1.0;
+    }
+
+    // Compute intersection with the plane y=0
+    vec3 p = ro + t * rd;
+    float r = length(p.xz);
+    if (r_inner <= r && r <= r_outer) {
+        return t;
+    }
+    return -1.0;
+}
+
+
+void main() {
+
+    // Convert pixel coord to NDC in [-1, 1], gl_FragCoord is already at the pixel center
+    vec2 ndc = (gl_FragCoord.xy / uResolution) * 2.0 - 1.0;
+
+    // Convert NDC to a world-space direction using FOV and aspect ratio
+    float aspect = uResolution.x / uResolution.y;
+    float tan_half_fov = tan(uFov / 2.0);
+    vec3 rd = normalize(ndc.x * aspect * tan_half_fov * uRight
+                        + ndc.y * tan_half_fov * uUp
+                        + uForward);
+
+    // Check for intersections
+    float t_bh = intersect_sphere(uCamPos, rd, uBHRadius);
+    float t_disk = intersect_disk(uCamPos, rd, uRInner, uROuter);
+
+    // Decide what pixel sees
+    if (t_bh > 0.0 && (t_disk < 0.0 || t_bh < t_disk)) {
+        // Hit black hole - render black
+        fragColor = vec4(0.0, 0.0, 0.0, 1.0);
+    }
+    else if (t_disk > 0.0) {
+        // Hit disk - warm color gradient from yellow to red
+        vec3 hit = uCamPos + t_disk * rd;
+        float u = clamp((length(hit.xz) - uRInner) / (uROuter - uRInner), 0.0, 1.0);
+        float brightness = floor(255.0 * (1.0 - 0.8 * u));
+        fragColor = vec4(brightness, floor(brightness * 0.8), floor(brightness * 0.3), 255.0) / 255.0;
+    }
+    else {
+        // Background color - dark blue
+        fragColor = vec4(25.0, 25.0, 45.0, 255.0) / 255.0;
+    }
+}
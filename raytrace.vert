@@ -0,0 +1,9 @@
+#version 330 core
+
+// raytrace.vert
+
+// Fullscreen triangle generated from the vertex index, no vertex buffer needed
+void main() {
+    vec2 pos = vec2((gl_VertexID << 1) & 2, gl_VertexID & 2);
+    gl_Position = vec4(pos * 2.0 - 1.0, 0.0, 1.0);
+}
@@ -0,0 +1,46 @@
+# raytrace_c.py
+
+# Import necessary modules
+import ctypes
+import os
+from importlib.machinery import EXTENSION_SUFFIXES
+import numpy as np
+
+# Find the compiled kernel built by setup.py, raise ImportError so callers can fall back
+_here = os.path.dirname(os.path.abspath(__file__))
+_paths = [os.path.join(_here, "libraytrace" + suffix) for suffix in EXTENSION_SUFFIXES]
+_paths = [path for path in _paths if os.path.exists(path)]
+if not _paths:
+    raise ImportError("libraytrace is not built, run: python setup.py build_ext --inplace")
+
+# Load the library and declare the kernel signature, a broken build also raises ImportError
+try:
+    _lib = ctypes.CDLL(_paths[0])
+except OSError as error:
+    raise ImportError(f"libraytrace could not be loaded, rebuild with: python setup.py build_ext --inplace ({error})") from error
+_floats = np.ctypeslib.ndpointer(dtype=np.float32, flags="C_CONTIGUOUS")
+_pixels = np.ctypeslib.ndpointer(dtype=np.uint8, flags="C_CONTIGUOUS")
+_lib.render_tile.argtypes = [_floats, _floats, _floats, _floats, ctypes.c_int,
+                             ctypes.c_float, ctypes.c_float, ctypes.c_float, _pixels]
+_lib.render_tile.restype = None
+
+
+# Render a tile of pixels
+def render_tile(ro, rdx, rdy, rdz, bh_r, r_in, r_out, out):
+
+    """
+
+    Run the compiled C raytracer on a tile, ctypes releases the GIL during the call
+
+    Inputs: ray origin (ro), ray direction components (rdx, rdy, rdz, contiguous float32 (H, W) arrays),
+            black hole radius, inner and outer radius of disk, output tile (out, (H, W, 3) uint8 array)
+
+    Outputs: none, pixel colors are written into out
+
+    """
+
+    # ndpointer only checks dtype and contiguity, mismatched sizes would write past out
+    if ro.size != 3 or rdy.shape != rdx.shape or rdz.shape != rdx.shape or out.shape != rdx.shape + (3,):
+        raise ValueError("render_tile needs 3 ray origin values and matching (H, W) ray and (H, W, 3) output arrays")
+
+    _lib.render_tile(ro, rdx, rdy, rdz, rdx.size, bh_r, r_in, r_out, out)
@@ -0,0 +1,170 @@
+// raytrace_kernel.c
+
+// Build in place with: python setup.py build_ext --inplace
+
+#include <float.h>
+#include <math.h>
+#include <stdint.h>
+
+#if defined(__AVX2__) && defined(__FMA__)
+#include <immintrin.h>
+#endif
+
+
+// Render a tile of pixels
+//
+// Inputs: ray origin (ro, 3 floats), ray direction components (rdx, rdy, rdz, n floats each),
+//         number of rays (n), black hole radius, inner and outer radius of disk,
+//         output pixels (out_rgb, n * 3 bytes)
+//
+// Outputs: none, pixel colors are written into out_rgb
+void render_tile(const float *ro, const float *rdx, const float *rdy, const float *rdz,
+                 int n, float bh_r, float r_in, float r_out, uint8_t *out_rgb)
+{
+    // Unpack the ray origin once
+    const float ro0 = ro[0];
+    const float ro1 = ro[1];
+    const float ro2 = ro[2];
+
+    // Terms that are the same for every ray
+    const float c = ro0*ro0 + ro1*ro1 + ro2*ro2 - bh_r*bh_r;
+    const float r_in2 = r_in*r_in;
+    const float r_out2 = r_out*r_out;
+
+    // First ray not handled by the vector loop
+    int start = 0;
+
+#if defined(__AVX2__) && defined(__FMA__)
+    // Broadcast constants, FLT_MAX marks a miss so the nearest hit is a plain compare
+    const __m256 v_ro0 = _mm256_set1_ps(ro0);
+    const __m256 v_ro1 = _mm256_set1_ps(ro1);
+    const __m256 v_ro2 = _mm256_set1_ps(ro2);
+    const __m256 v_neg_ro1 = _mm256_set1_ps(-ro1);
+    const __m256 v_four_c = _mm256_set1_ps(4.0f * c);
+    const __m256 v_r_in = _mm256_set1_ps(r_in);
+    const __m256 v_r_in2 = _mm256_set1_ps(r_in2);
+    const __m256 v_r_out2 = _mm256_set1_ps(r_out2);
+    const __m256 v_width = _mm256_set1_ps(r_out - r_in);
+    const __m256 v_eps = _mm256_set1_ps(1e-6f);
+    const __m256 v_far = _mm256_set1_ps(FLT_MAX);
+    const __m256 v_zero = _mm256_setzero_ps();
+    const __m256 v_half = _mm256_set1_ps(0.5f);
+    const __m256 v_one = _mm256_set1_ps(1.0f);
+    const __m256 v_two = _mm256_set1_ps(2.0f);
+    const __m256 v_abs = _mm256_castsi256_ps(_mm256_set1_epi32(0x7fffffff));
+
+    // Background color, packed as one 32 bit value per pixel
+    const __m256i v_background = _mm256_set1_epi32(25 | (25 << 8) | (45 << 16));
+
+    // Gathers the low 3 bytes of each 32 bit pixel into the first 12 bytes of each 128 bit lane
+    const __m256i v_pack = _mm256_setr_epi8(0, 1, 2, 4, 5, 6, 8, 9, 10, 12, 13, 14, -1, -1, -1, -1,
+                                            0, 1, 2, 4, 5, 6, 8, 9, 10, 12, 13, 14, -1, -1, -1, -1);
+    const __m128i v_store3 = _mm_setr_epi32(-1, -1, -1, 0);
+
+    // 8 rays per iteration, both roots and all masks are computed and blended, no branches
+    for (; start + 8 <= n; start += 8) {
+
+        // Get ray directions
+        const __m256 rdx_v = _mm256_loadu_ps(rdx + start);
+        const __m256 rdy_v = _mm256_loadu_ps(rdy + start);
+        const __m256 rdz_v = _mm256_loadu_ps(rdz + start);
+
+        // Check for intersection with the black hole
+        const __m256 b = _mm256_mul_ps(v_two, _mm256_fmadd_ps(v_ro0, rdx_v,
+                                              _mm256_fmadd_ps(v_ro1, rdy_v, _mm256_mul_ps(v_ro2, rdz_v))));
+        const __m256 disc = _mm256_fmsub_ps(b, b, v_four_c);
+        const __m256 sqrt_disc = _mm256_sqrt_ps(_mm256_max_ps(disc, v_zero));
+        const __m256 t0 = _mm256_mul_ps(_mm256_sub_ps(_mm256_sub_ps(v_zero, b), sqrt_disc), v_half);
+        const __m256 t1 = _mm256_mul_ps(_mm256_sub_ps(sqrt_disc, b), v_half);
+        __m256 t_bh = _mm256_blendv_ps(v_far, t1, _mm256_cmp_ps(t1, v_eps, _CMP_GT_OQ));
+        t_bh = _mm256_blendv_ps(t_bh, t0, _mm256_cmp_ps(t0, v_eps, _CMP_GT_OQ));
+        t_bh = _mm256_blendv_ps(t_bh, v_far, _mm256_cmp_ps(disc, v_zero, _CMP_LT_OQ));
+
+        // Check for intersection with the disk in the plane y=0, avoiding division by zero
+        const __m256 parallel = _mm256_cmp_ps(_mm256_and_ps(rdy_v, v_abs), v_eps, _CMP_LT_OQ);
+        const __m256 t = _mm256_div_ps(v_neg_ro1, _mm256_blendv_ps(rdy_v, v_one, parallel));
+        const __m256 px = _mm256_fmadd_ps(t, rdx_v, v_ro0);
+        const __m256 pz = _mm256_fmadd_ps(t, rdz_v, v_ro2);
+        const __m256 r2 = _mm256_fmadd_ps(px, px, _mm256_mul_ps(pz, pz));
+        __m256 valid = _mm256_andnot_ps(parallel, _mm256_cmp_ps(t, v_eps, _CMP_GE_OQ));
+        valid = _mm256_and_ps(valid, _mm256_cmp_ps(r2, v_r_in2, _CMP_GE_OQ));
+        valid = _mm256_and_ps(valid, _mm256_cmp_ps(r2, v_r_out2, _CMP_LE_OQ));
+        const __m256 t_disk = _mm256_blendv_ps(v_far, t, valid);
+
+        // Decide what each pixel sees
+        const __m256 hit_bh = _mm256_cmp_ps(t_bh, t_disk, _CMP_LT_OQ);
+        const __m256 hit_disk = _mm256_andnot_ps(hit_bh, valid);
+
+        // Disk shading, warm color gradient from yellow to red
+        __m256 u = _mm256_div_ps(_mm256_sub_ps(_mm256_sqrt_ps(r2), v_r_in), v_width);
+        u = _mm256_min_ps(_mm256_max_ps(u, v_zero), v_one);
+        const __m256 brightness = _mm256_round_ps(
+            _mm256_mul_ps(_mm256_set1_ps(255.0f), _mm256_fnmadd_ps(_mm256_set1_ps(0.8f), u, v_one)),
+            _MM_FROUND_TO_ZERO | _MM_FROUND_NO_EXC);
+        const __m256i red = _mm256_cvttps_epi32(brightness);
+        const __m256i green = _mm256_cvttps_epi32(_mm256_mul_ps(brightness, _mm256_set1_ps(0.8f)));
+        const __m256i blue = _mm256_cvttps_epi32(_mm256_mul_ps(brightness, _mm256_set1_ps(0.3f)));
+        const __m256i disk = _mm256_or_si256(red, _mm256_or_si256(_mm256_slli_epi32(green, 8),
+                                                                  _mm256_slli_epi32(blue, 16)));
+
+        // Background, then disk, then black hole which is black
+        __m256i rgb = _mm256_blendv_epi8(v_background, disk, _mm256_castps_si256(hit_disk));
+        rgb = _mm256_andnot_si256(_mm256_castps_si256(hit_bh), rgb);
+
+        // Pack to 3 bytes per pixel and write 12 bytes per lane with masked stores
+        rgb = _mm256_shuffle_epi8(rgb, v_pack);
+        _mm_maskstore_epi32((int *)(out_rgb + 3*start), v_store3, _mm256_castsi256_si128(rgb));
+        _mm_maskstore_epi32((int *)(out_rgb + 3*start + 12), v_store3, _mm256_extracti128_si256(rgb, 1));
+    }
+#endif
+
+    // Remaining rays, or every ray without AVX2
+    // Every pixel runs the same instructions, misses are selected away instead of branched on
+    #pragma omp simd
+    for (int i = start; i < n; i++) {
+
+        // Get ray direction
+        const float rd0 = rdx[i];
+        const float rd1 = rdy[i];
+        const float rd2 = rdz[i];
+
+        // Check for intersection with the black hole, -1 means no intersection
+        const float b = 2.0f * (ro0*rd0 + ro1*rd1 + ro2*rd2);
+        const float disc = b*b - 4.0f*c;
+        const float sqrt_disc = sqrtf(fmaxf(disc, 0.0f));
+        const float t0 = (-b - sqrt_disc) / 2.0f;
+        const float t1 = (-b + sqrt_disc) / 2.0f;
+        float t_bh = t1 > 1e-6f ? t1 : -1.0f;
+        t_bh = t0 > 1e-6f ? t0 : t_bh;
+        t_bh = disc >= 0.0f ? t_bh : -1.0f;
+
+        // Check for intersection with the disk in the plane y=0, avoiding division by zero
+        const int parallel = fabsf(rd1) < 1e-6f;
+        const float t_disk = -ro1 / (parallel ? 1.0f : rd1);
+        const float px = ro0 + t_disk*rd0;
+        const float pz = ro2 + t_disk*rd2;
+        const float r2 = px*px + pz*pz;
+        const int hit_disk = !parallel && t_disk >= 1e-6f && r2 >= r_in2 && r2 <= r_out2;
+
+        // Decide what pixel sees
+        const int hit_bh = t_bh > 0.0f && (!hit_disk || t_bh < t_disk);
+
+        // Disk shading, warm color gradient from yellow to red
+        float u = (sqrtf(r2) - r_in) / (r_out - r_in);
+        u = fminf(fmaxf(u, 0.0f), 1.0f);
+        const float brightness = truncf(255.0f * (1.0f - 0.8f * u));
+
+        // Background is dark blue, disk is shaded, black hole is black
+        // Colors are selected as floats and converted once so the loop has no branches
+        float red = hit_disk ? brightness : 25.0f;
+        float green = hit_disk ? truncf(brightness * 0.8f) : 25.0f;
+        float blue = hit_disk ? truncf(brightness * 0.3f) : 45.0f;
+        red = hit_bh ? 0.0f : red;
+        green = hit_bh ? 0.0f : green;
+        blue = hit_bh ? 0.0f : blue;
+
+        out_rgb[3*i + 0] = (uint8_t)(int)red;
+        out_rgb[3*i + 1] = (uint8_t)(int)green;
+        out_rgb[3*i + 2] = (uint8_t)(int)blue;
+    }
+}
@@ -0,0 +1,146 @@
+# render_kernel.py
+
+# Import necessary modules
+import math
+from numba import njit, prange
+
+
+# Check for intersection between ray and sphere
+@njit(fastmath=True, cache=True)
+def intersect_sphere(ro0, ro1, ro2, rd0, rd1, rd2, radius):
+
+    """
+
+    Check for intersection between ray and sphere using scalar math only
+
+    Inputs: ray origin (ro0, ro1, ro2), ray direction (rd0, rd1, rd2), sphere radius
+
+    Outputs: distance to intersection or -1.0 if no intersection
+
+    """
+
+    # Solve |ro + t*rd|^2 = radius^2
+    b = 2.0 * (ro0*rd0 + ro1*rd1 + ro2*rd2)
+    c = ro0*ro0 + ro1*ro1 + ro2*ro2 - radius*radius
+    disc = b*b - 4.0*c
+
+    # No intersection if discriminant is negative
+    if disc < 0.0:
+        return -1.0
+
+    # Return the nearest positive intersection
+    sqrt_disc = math.sqrt(disc)
+    t0 = (-b - sqrt_disc) / 2.0
+    t1 = (-b + sqrt_disc) / 2.0
+    if t0 > 1e-6:
+        return t0
+    if t1 > 1e-6:
+        return t1
+
+    # No valid intersection
+    return -1.0
+
+
+# Check for intersection between ray and disk
+@njit(fastmath=True, cache=True)
+def intersect_disk(ro0, ro1, ro2, rd0, rd1, rd2, r_inner, r_outer):
+
+    """
+
+    Check for intersection between ray and accretion disk using scalar math only
+
+    Inputs: ray origin (ro0, ro1, ro2), ray direction (rd0, rd1, rd2), inner and outer radius of disk
+
+    Outputs: distance to intersection or -1.0 if no intersection
+
+    """
+
+    # Avoid division by zero
+    if abs(rd1) < 1e-6:
+        return -1.0
+
+    # Compute t where ray intersects the plane y=0
+    t = -ro1 / rd1
+    if t < 1e-6:
+        return -1.0
+
+    # Compute intersection with the plane y=0
+    px = ro0 + t*rd0
+    pz = ro2 + t*rd2
+    r = math.sqrt(px*px + pz*pz)
+    if r_inner <= r <= r_outer:
+        return t
+
+    # No intersection
+    return -1.0
+
+
+# Render a tile of pixels
+@njit(parallel=True, fastmath=True, cache=True)
+def render_tile(ro, rdx, rdy, rdz, bh_r, r_in, r_out, out):
+
+    """
+
+    Compiled per-pixel raytracer, rows are split across all cores
+
+    Inputs: ray origin (ro), ray direction components (rdx, rdy, rdz, (H, W) arrays), black hole radius,
+            inner and outer radius of disk, output tile (out, (H, W, 3) uint8 array)
+
+    Outputs: none, pixel colors are written into out
+
+    """
+
+    # Unpack the ray origin once
+    ro0 = ro[0]
+    ro1 = ro[1]
+    ro2 = ro[2]
+
+    # Constant term of the quadratic for the sphere bounding the disk
+    c_bound = ro0*ro0 + ro1*ro1 + ro2*ro2 - r_out*r_out
+
+    for y in prange(rdx.shape[0]):
+        for x in range(rdx.shape[1]):
+
+            # Get ray direction
+            rd0 = rdx[y, x]
+            rd1 = rdy[y, x]
+            rd2 = rdz[y, x]
+
+            # Rays that miss the sphere bounding the disk see only background
+            b = 2.0 * (ro0*rd0 + ro1*rd1 + ro2*rd2)
+            if b*b - 4.0*c_bound < 0.0:
+                out[y, x, 0] = 25
+                out[y, x, 1] = 25
+                out[y, x, 2] = 45
+                continue
+
+            # Check for intersections
+            t_bh = intersect_sphere(ro0, ro1, ro2, rd0, rd1, rd2, bh_r)
+            t_disk = intersect_disk(ro0, ro1, ro2, rd0, rd1, rd2, r_in, r_out)
+            hit_bh = t_bh > 0.0
+            hit_disk = t_disk > 0.0
+
+            # Decide what pixel sees
+            if hit_bh and (not hit_disk or t_bh < t_disk):
+                # Hit black hole - render black
+                out[y, x, 0] = 0
+                out[y, x, 1] = 0
+                out[y, x, 2] = 0
+
+            elif hit_disk:
+                # Hit disk - warm color gradient from yellow to red
+                px = ro0 + t_disk*rd0
+                pz = ro2 + t_disk*rd2
+                r = math.sqrt(px*px + pz*pz)
+                u = (r - r_in) / (r_out - r_in)
+                u = min(max(u, 0.0), 1.0)
+                brightness = int(255 * (1 - 0.8 * u))
+                out[y, x, 0] = brightness
+                out[y, x, 1] = int(brightness * 0.8)
+                out[y, x, 2] = int(brightness * 0.3)
+
+            else:
+                # Background color - dark blue
+                out[y, x, 0] = 25
+                out[y, x, 1] = 25
+                out[y, x, 2] = 45
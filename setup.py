@@ -0,0 +1,19 @@
+# setup.py
+
+# Build the C raytracing kernel next to the sources with:
+#     python setup.py build_ext --inplace
+
+# Import necessary modules
+from setuptools import setup, Extension
+
+setup(
+    name="black-hole-project",
+    py_modules=[],
+    ext_modules=[
+        Extension(
+            "libraytrace",
+            sources=["raytrace_kernel.c"],
+            extra_compile_args=["-O3", "-march=native", "-ffast-math", "-fopenmp-simd"],
+        )
+    ],
+)